@@ -1,132 +1,399 @@
 import logging
-from datetime import datetime, timedelta
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from urllib.parse import urlencode
 
 import requests
-from requests.exceptions import HTTPError
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
 
+from ghostfolio._common import (
+    AUTH_TIMEOUT,
+    JSON_HEADERS,
+    MAX_RETRIES,
+    RETRY_BACKOFF_FACTOR,
+    RETRY_STATUSES,
+    BaseClient,
+    PartialImportError,
+    import_chunks,
+    json_dumps,
+    json_loads,
+    jwt_lock,
+)
+from ghostfolio.ratelimit import TokenBucket, retry_after
 
-class Ghostfolio:
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+CACHE_MAXSIZE = 128
+ACCEPT_HEADERS = {"Accept": "application/json"}
+
+
+class Ghostfolio(BaseClient):
     """Ghostfolio API client."""
 
-    def __init__(self, token: str, host: str = "https://ghostfol.io/"):
-        self.host = host
-        self.token = token
-        self._jwt_token: str | None = None
-        self._jwt_token_expiry: datetime | None = None
+    def __init__(
+        self,
+        token: str,
+        host: str = "https://ghostfol.io/",
+        verify_ssl: bool = True,
+        cache_ttl: float = 30,
+        rate_limit: float | None = None,
+        http2: bool = False,
+        preconnect: bool = True,
+    ):
+        super().__init__(token, host)
+
+        # Raw GET response bodies and their ETags keyed by (url, params). Bodies
+        # are decoded on every hit so callers never share a mutable result.
+        self.cache_ttl = cache_ttl
+        self._cache: dict[tuple, tuple[float, bytes, str | None]] = {}
+        self._cache_lock = threading.Lock()
+        self._executor: ThreadPoolExecutor | None = None
+
+        # Requests per second, None for no client-side limit
+        self._rate_limiter = TokenBucket(rate_limit) if rate_limit else None
+
+        self._http2 = http2
+        if http2:
+            self._session = self._httpx_client(verify_ssl)
+        else:
+            self._session = self._requests_session(verify_ssl)
+
+        self._hash = hash((self.token, self.host))
 
-    def _url(self, endpoint: str, object_id: str = None, api_version: str = "v1"):
-        return f"{self.host}/api/{api_version}/{endpoint}/" + (
-            object_id + "/" if object_id else ""
+        # Authenticate in the background so the first call finds a warm connection
+        if preconnect:
+            threading.Thread(target=self._warmup, daemon=True).start()
+
+    @staticmethod
+    def _httpx_client(verify_ssl: bool):
+        if httpx is None:
+            raise ImportError("http2=True requires httpx, install ghostfolio[http2]")
+
+        # httpx negotiates compression itself and retries only on the connection
+        # level, status based retries are handled in _send_with_retries. Its 5 second
+        # default timeout is disabled to match requests.
+        return httpx.Client(
+            http2=True,
+            verify=verify_ssl,
+            headers={"Accept": "application/json"},
+            limits=httpx.Limits(max_keepalive_connections=20),
+            timeout=None,
+        )
+
+    @staticmethod
+    def _requests_session(verify_ssl: bool) -> requests.Session:
+        session = requests.Session()
+        session.verify = verify_ssl
+        session.headers.update(ACCEPT_HEADERS)
+        # Only idempotent methods are retried, so imports are never duplicated
+        retry = Retry(
+            total=MAX_RETRIES,
+            backoff_factor=RETRY_BACKOFF_FACTOR,
+            status_forcelist=RETRY_STATUSES,
+            respect_retry_after_header=True,
+            raise_on_status=False,
         )
+        adapter = HTTPAdapter(pool_connections=10, pool_maxsize=20, max_retries=retry)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    def close(self):
+        """Close the underlying HTTP session."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+        self._session.close()
+
+    def __enter__(self):
+        return self
 
-    def _refresh_jwt_token(self):
-        if self._jwt_token is not None and self._jwt_token_expiry < datetime.now():
+    def __exit__(self, *exc):
+        self.close()
+
+    def _warmup(self):
+        try:
+            self._refresh_jwt_token()
+        except Exception as err:
+            self._preconnect_failed(err)
+
+    def _set_jwt_token(self, jwt_token: str, expiry: datetime):
+        # The header goes first, other threads skip the refresh once the token is set
+        self._session.headers["Authorization"] = f"Bearer {jwt_token}"
+        super()._set_jwt_token(jwt_token, expiry)
+
+    def _refresh_jwt_token(self, force: bool = False):
+        if not force and self._jwt_token_current():
             return
 
-        self._jwt_token = self._process_response(
-            requests.post(
-                f"{self.host}/api/v1/auth/anonymous/", {"accessToken": self.token}
+        # When forced, the current token was rejected and must not be reused
+        stale = self._jwt_token if force else None
+        with jwt_lock(self._jwt_key):
+            if self._use_cached_jwt_token(stale):
+                return
+
+            self._store_jwt_token(
+                self._process_response(
+                    self._session.post(
+                        self._urls["auth"],
+                        data={"accessToken": self.token},
+                        timeout=AUTH_TIMEOUT,
+                    )
+                )["authToken"]
             )
-        )["authToken"]
-        self._jwt_token_expiry = datetime.now() + timedelta(days=30)
 
-    def get(self, endpoint: str, params=None, api_version: str = "v1"):
+    def clear_cache(self):
+        """Drop all cached GET responses."""
+        with self._cache_lock:
+            self._cache.clear()
+
+    def _cache_get(self, key: tuple) -> tuple[float, bytes, str | None] | None:
+        with self._cache_lock:
+            return self._cache.get(key)
+
+    def _cache_set(self, key: tuple, content: bytes, etag: str | None):
+        with self._cache_lock:
+            self._cache.pop(key, None)
+            if len(self._cache) >= CACHE_MAXSIZE:
+                del self._cache[next(iter(self._cache))]
+            self._cache[key] = (time.monotonic() + self.cache_ttl, content, etag)
+
+    def _send(
+        self,
+        method: str,
+        url: str,
+        params=None,
+        body: bytes | None = None,
+        headers=None,
+        stream: bool = False,
+    ):
         self._refresh_jwt_token()
 
-        return self._process_response(
-            requests.get(
-                self._url(endpoint, api_version=api_version),
-                headers={"Authorization": f"Bearer {self._jwt_token}"},
-                params=params,
-            )
+        resp = self._send_with_retries(method, url, params, body, headers, stream)
+        if resp.status_code == 401:
+            # The server rejected the JWT before its advertised expiry
+            resp.close()
+            self._refresh_jwt_token(force=True)
+            resp = self._send_with_retries(method, url, params, body, headers, stream)
+        return resp
+
+    def _send_with_retries(
+        self, method: str, url: str, params, body, headers, stream: bool
+    ):
+        for attempt in range(MAX_RETRIES + 1):
+            if self._rate_limiter is not None:
+                self._rate_limiter.acquire()
+            if self._http2:
+                # Streaming is only used with requests, see _iter_items
+                resp = self._session.request(
+                    method, url, params=params, content=body, headers=headers
+                )
+            else:
+                resp = self._session.request(
+                    method,
+                    url,
+                    params=params,
+                    data=body,
+                    headers=headers,
+                    stream=stream,
+                )
+
+            # The requests adapter retries idempotent methods itself. Server errors
+            # are never retried for POST, a 429 means it was not processed at all
+            if self._http2 or method not in Retry.DEFAULT_ALLOWED_METHODS:
+                retryable = resp.status_code == 429 or (
+                    resp.status_code in RETRY_STATUSES and method != "POST"
+                )
+            else:
+                retryable = False
+            if not retryable or attempt == MAX_RETRIES:
+                return resp
+            resp.close()
+            time.sleep(retry_after(resp.headers, attempt, RETRY_BACKOFF_FACTOR))
+
+    def _request(self, method: str, url: str, **kwargs):
+        return self._process_response(self._send(method, url, **kwargs))
+
+    def get(
+        self,
+        endpoint: str,
+        params=None,
+        api_version: str = "v1",
+        use_cache: bool = True,
+    ):
+        return self._get(
+            self._url(endpoint, api_version=api_version), params, use_cache
         )
 
+    def _get(self, url: str, params=None, use_cache: bool = True):
+        if not (use_cache and self.cache_ttl > 0):
+            return self._request("GET", url, params=params)
+
+        # The encoded query also handles list values and lists of pairs
+        key = (url, urlencode(params or {}, doseq=True))
+        cached = self._cache_get(key)
+        if cached is not None and cached[0] > time.monotonic():
+            return json_loads(cached[1])
+
+        # Expired entries are revalidated with the server instead of refetched
+        headers = {"If-None-Match": cached[2]} if cached and cached[2] else None
+        resp = self._send("GET", url, params=params, headers=headers)
+        etag = resp.headers.get("ETag")
+        if resp.status_code == 304 and cached is not None:
+            # A 304 need not repeat the ETag, keep the one we revalidated with
+            content = cached[1]
+            etag = etag or cached[2]
+        else:
+            self._check_response(resp)
+            content = resp.content
+        self._cache_set(key, content, etag)
+        return json_loads(content)
+
+    def _iter_items(self, url: str, key: str, params=None):
+        """Yield the items of the list under `key` while the response downloads."""
+        if ijson is None or self._http2:
+            yield from self._request("GET", url, params=params)[key]
+            return
+
+        resp = self._send("GET", url, params=params, stream=True)
+        with resp:
+            self._check_response(resp)
+            resp.raw.decode_content = True
+            yield from ijson.items(resp.raw, f"{key}.item", use_float=True)
+
+    def prefetch(self, methods: list[str]) -> list[Future]:
+        """Warm the cache by calling read methods such as "holdings" in the background."""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(thread_name_prefix="ghostfolio")
+        return [self._executor.submit(getattr(self, method)) for method in methods]
+
     def post(
         self, endpoint: str, data=None, api_version: str = "v1", object_id: str = None
     ):
-        self._refresh_jwt_token()
-
-        return self._process_response(
-            requests.post(
-                self._url(endpoint, object_id, api_version),
-                headers={"Authorization": f"Bearer {self._jwt_token}"},
-                json=data,
-            )
-        )
+        return self._write("POST", self._url(endpoint, object_id, api_version), data)
 
     def put(
         self, endpoint: str, data=None, api_version: str = "v1", object_id: str = None
     ):
-        self._refresh_jwt_token()
+        return self._write("PUT", self._url(endpoint, object_id, api_version), data)
 
-        return self._process_response(
-            requests.put(
-                self._url(endpoint, object_id, api_version),
-                headers={"Authorization": f"Bearer {self._jwt_token}"},
-                json=data,
-            )
+    def _write(self, method: str, url: str, data=None):
+        result = self._request(
+            method,
+            url,
+            body=json_dumps(data) if data is not None else None,
+            headers=JSON_HEADERS,
         )
+        self.clear_cache()
+        return result
 
     @staticmethod
-    def _process_response(resp):
-        try:
-            resp.raise_for_status()
-        except HTTPError as http_err:
+    def _check_response(resp):
+        # Raises requests.HTTPError or httpx.HTTPStatusError depending on backend
+        if resp.status_code >= 400:
             logging.error(resp.text)
-            raise http_err
+            resp.raise_for_status()
 
-        return resp.json()
+    @staticmethod
+    def _process_response(resp):
+        Ghostfolio._check_response(resp)
+        return json_loads(resp.content)
 
-    def orders(self, account_id: str | None = None) -> dict:
+    def orders(self, account_id: str | None = None, use_cache: bool = True) -> dict:
         """Get all orders."""
         params = {"accounts": account_id} if account_id else None
-        return self.get("order", params=params)
+        return self._get(self._urls["orders"], params, use_cache)
 
-    def performance(self, date_range: str = "max") -> dict:
-        return self.get(
-            "portfolio/performance", params={"range": date_range}, api_version="v2"
-        )
+    def orders_iter(self, account_id: str | None = None):
+        """Iterate over orders without loading the whole response into memory."""
+        params = {"accounts": account_id} if account_id else None
+        return self._iter_items(self._urls["orders"], "activities", params=params)
 
-    def holdings(self, date_range: str = "max") -> dict:
-        return self.get("portfolio/holdings", params={"range": date_range})
+    def performance(self, date_range: str = "max", use_cache: bool = True) -> dict:
+        return self._get(self._urls["performance"], {"range": date_range}, use_cache)
 
-    def position(self, data_source: str, symbol: str):
+    def holdings(self, date_range: str = "max", use_cache: bool = True) -> dict:
+        return self._get(self._urls["holdings"], {"range": date_range}, use_cache)
+
+    def position(self, data_source: str, symbol: str, use_cache: bool = True):
         """Get position for a symbol from a data source."""
-        return self.get(f"portfolio/position/{data_source}/{symbol}")
+        return self.get(
+            f"portfolio/position/{data_source}/{symbol}", use_cache=use_cache
+        )
+
+    def import_transactions(self, data: dict, chunk_size: int | None = None):
+        """Import transactions, optionally posting `chunk_size` activities at a time.
 
-    def import_transactions(self, data: dict):
-        """Import transactions."""
-        self.post("import", data)
+        Raises PartialImportError if a chunk fails after earlier ones were imported.
+        """
+        imported = 0
+        for chunk in import_chunks(data, chunk_size):
+            try:
+                self._write("POST", self._urls["import"], chunk)
+            except Exception as err:
+                if imported:
+                    raise PartialImportError(imported) from err
+                raise
+            imported += len(chunk.get("activities") or [])
 
-    def details(self) -> dict:
+    def details(self, use_cache: bool = True) -> dict:
         """Get all details, including accounts, positions, and summary."""
-        return self.get("portfolio/details")
+        return self._get(self._urls["details"], use_cache=use_cache)
 
-    def investments(self, group_by: str = "month", date_range: str = "max") -> dict:
+    def investments(
+        self, group_by: str = "month", date_range: str = "max", use_cache: bool = True
+    ) -> dict:
         """Get investments grouped by period."""
-        return self.get(
-            "portfolio/investments", params={"range": date_range, "groupBy": group_by}
+        return self._get(
+            self._urls["investments"],
+            {"range": date_range, "groupBy": group_by},
+            use_cache,
         )
 
-    def dividends(self, group_by: str = "month", date_range: str = "max") -> dict:
+    def dividends(
+        self, group_by: str = "month", date_range: str = "max", use_cache: bool = True
+    ) -> dict:
         """Get dividends grouped by period."""
-        return self.get(
-            "portfolio/dividends", params={"range": date_range, "groupBy": group_by}
+        return self._get(
+            self._urls["dividends"],
+            {"range": date_range, "groupBy": group_by},
+            use_cache,
         )
 
-    def accounts(self) -> dict:
-        return self.get("account")
+    def accounts(self, use_cache: bool = True) -> dict:
+        return self._get(self._urls["accounts"], use_cache=use_cache)
 
-    def market_data_admin(self) -> dict:
+    def market_data_admin(self, use_cache: bool = True) -> dict:
         """Overview of market data loaded"""
-        return self.get("admin/market-data")
+        return self._get(self._urls["market_data_admin"], use_cache=use_cache)
 
-    def market_data(self, data_source: str, symbol: str):
+    def market_data_admin_iter(self):
+        """Iterate over the market data overview without loading it all into memory."""
+        return self._iter_items(self._urls["market_data_admin"], "marketData")
+
+    def market_data(self, data_source: str, symbol: str, use_cache: bool = True):
         """Get market data for a symbol from a data source."""
-        return self.get(f"admin/market-data/{data_source}/{symbol}")
+        return self.get(
+            f"admin/market-data/{data_source}/{symbol}", use_cache=use_cache
+        )
 
     def __hash__(self) -> int:
-        return hash((self.token, self.host))
+        return self._hash
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Ghostfolio):
+            return NotImplemented
+        return (self.token, self.host) == (other.token, other.host)
 
     def __repr__(self):
         return f"Ghostfolio(host={self.host})"
@@ -0,0 +1,167 @@
+import base64
+import json
+import logging
+import threading
+from datetime import datetime, timedelta, timezone
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+JWT_EXPIRY_MARGIN = timedelta(minutes=2)
+JWT_DEFAULT_TTL = timedelta(days=30)
+AUTH_TIMEOUT = 30
+
+MAX_RETRIES = 5
+RETRY_BACKOFF_FACTOR = 0.5
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+# Fixed endpoints as (path, api version), resolved to full URLs once per client
+ENDPOINTS = {
+    "auth": ("auth/anonymous", "v1"),
+    "orders": ("order", "v1"),
+    "performance": ("portfolio/performance", "v2"),
+    "holdings": ("portfolio/holdings", "v1"),
+    "import": ("import", "v1"),
+    "details": ("portfolio/details", "v1"),
+    "investments": ("portfolio/investments", "v1"),
+    "dividends": ("portfolio/dividends", "v1"),
+    "accounts": ("account", "v1"),
+    "market_data_admin": ("admin/market-data", "v1"),
+}
+
+# JWTs shared by all clients, keyed by (token, host). The global lock only guards
+# the dicts, refreshes are serialised per key so one slow host blocks no other.
+_JWT_CACHE: dict[tuple[str, str], tuple[str, datetime]] = {}
+_JWT_LOCKS: dict[tuple[str, str], threading.Lock] = {}
+_JWT_CACHE_LOCK = threading.Lock()
+
+
+def jwt_lock(key: tuple[str, str]) -> threading.Lock:
+    with _JWT_CACHE_LOCK:
+        return _JWT_LOCKS.setdefault(key, threading.Lock())
+
+
+def json_loads(content: bytes):
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+def json_dumps(data) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data).encode()
+
+
+def jwt_expiry(jwt_token: str) -> datetime:
+    """Read the expiry from the JWT's exp claim, the signature is left to the server."""
+    try:
+        payload = jwt_token.split(".")[1]
+        claims = json_loads(
+            base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4))
+        )
+        return datetime.fromtimestamp(claims["exp"], timezone.utc)
+    except (IndexError, KeyError, TypeError, ValueError):
+        return datetime.now(timezone.utc) + JWT_DEFAULT_TTL
+
+
+def jwt_token_valid(expiry: datetime | None) -> bool:
+    now = datetime.now(timezone.utc)
+    return expiry is not None and expiry - JWT_EXPIRY_MARGIN > now
+
+
+class PartialImportError(Exception):
+    """A chunked import failed after some chunks were already committed."""
+
+    def __init__(self, imported: int):
+        super().__init__(f"Import failed after {imported} activities were imported")
+        self.imported = imported
+
+
+def import_chunks(data: dict, chunk_size: int | None):
+    """Split an import payload into payloads with at most chunk_size activities.
+
+    The server only maps activities to accounts, tags or asset profiles created in
+    the same request, so only payloads with nothing besides activities and meta
+    can be split.
+    """
+    activities = data.get("activities") or []
+    if not chunk_size or len(activities) <= chunk_size:
+        yield data
+        return
+
+    extra = set(data) - {"activities", "meta"}
+    if extra:
+        raise ValueError(
+            f"Cannot split an import that also contains {', '.join(sorted(extra))}"
+        )
+    for start in range(0, len(activities), chunk_size):
+        yield {**data, "activities": activities[start : start + chunk_size]}
+
+
+class BaseClient:
+    """URL building and JWT bookkeeping shared by the sync and async clients."""
+
+    def __init__(self, token: str, host: str):
+        self._host = host.rstrip("/")
+        self._token = token
+        self._base_v1 = f"{self.host}/api/v1/"
+        self._base_v2 = f"{self.host}/api/v2/"
+        self._urls = {
+            name: self._url(endpoint, api_version=api_version)
+            for name, (endpoint, api_version) in ENDPOINTS.items()
+        }
+        self._jwt_key = (self.token, self.host)
+        self._jwt_token: str | None = None
+        self._jwt_token_expiry: datetime | None = None
+
+    # Read-only, the URLs, JWT cache key and hash are derived from them
+    @property
+    def host(self) -> str:
+        return self._host
+
+    @property
+    def token(self) -> str:
+        return self._token
+
+    @staticmethod
+    def clear_auth_cache():
+        """Forget JWTs shared between clients."""
+        with _JWT_CACHE_LOCK:
+            _JWT_CACHE.clear()
+
+    def _url(self, endpoint: str, object_id: str = None, api_version: str = "v1"):
+        base = self._base_v2 if api_version == "v2" else self._base_v1
+        if object_id:
+            return base + endpoint + "/" + object_id + "/"
+        return base + endpoint + "/"
+
+    def _jwt_token_current(self) -> bool:
+        return self._jwt_token is not None and jwt_token_valid(self._jwt_token_expiry)
+
+    def _use_cached_jwt_token(self, stale: str | None) -> bool:
+        """Adopt a valid shared JWT other than `stale`, the token the server rejected."""
+        with _JWT_CACHE_LOCK:
+            cached = _JWT_CACHE.get(self._jwt_key)
+        if cached is None or cached[0] == stale or not jwt_token_valid(cached[1]):
+            return False
+        self._set_jwt_token(*cached)
+        return True
+
+    def _store_jwt_token(self, jwt_token: str):
+        expiry = jwt_expiry(jwt_token)
+        with _JWT_CACHE_LOCK:
+            _JWT_CACHE[self._jwt_key] = (jwt_token, expiry)
+        self._set_jwt_token(jwt_token, expiry)
+
+    def _set_jwt_token(self, jwt_token: str, expiry: datetime):
+        self._jwt_token = jwt_token
+        self._jwt_token_expiry = expiry
+
+    @staticmethod
+    def _preconnect_failed(err: Exception):
+        # The first API call retries and raises properly
+        logging.warning(f"Ghostfolio preconnect failed: {err}")
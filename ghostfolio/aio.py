@@ -0,0 +1,258 @@
+import asyncio
+import logging
+from datetime import datetime
+
+import aiohttp
+
+from ghostfolio._common import (
+    AUTH_TIMEOUT,
+    JSON_HEADERS,
+    MAX_RETRIES,
+    RETRY_BACKOFF_FACTOR,
+    RETRY_STATUSES,
+    BaseClient,
+    PartialImportError,
+    import_chunks,
+    json_dumps,
+    json_loads,
+)
+from ghostfolio.ratelimit import TokenBucket, retry_after
+
+
+class AsyncGhostfolio(BaseClient):
+    """Asynchronous Ghostfolio API client."""
+
+    def __init__(
+        self,
+        token: str,
+        host: str = "https://ghostfol.io/",
+        verify_ssl: bool = True,
+        limit_per_host: int = 64,
+        rate_limit: float | None = None,
+        preconnect: bool = True,
+    ):
+        super().__init__(token, host)
+        self._auth_headers: dict[str, str] = {}
+        self._jwt_lock = asyncio.Lock()
+
+        self._verify_ssl = verify_ssl
+        self._limit_per_host = limit_per_host
+        self._session: aiohttp.ClientSession | None = None
+
+        # Requests per second, None for no client-side limit
+        self._rate_limiter = TokenBucket(rate_limit) if rate_limit else None
+
+        self._preconnect = preconnect
+        self._preconnect_task: asyncio.Task | None = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        # The session has to be created inside a running event loop
+        if self._session is None or self._session.closed:
+            # aiohttp negotiates compression itself
+            self._session = aiohttp.ClientSession(
+                headers={"Accept": "application/json"},
+                connector=aiohttp.TCPConnector(
+                    limit_per_host=self._limit_per_host,
+                    keepalive_timeout=30,
+                    ssl=None if self._verify_ssl else False,
+                ),
+            )
+        return self._session
+
+    async def close(self):
+        """Close the underlying HTTP session."""
+        if self._preconnect_task is not None:
+            self._preconnect_task.cancel()
+        if self._session is not None:
+            await self._session.close()
+
+    async def __aenter__(self):
+        # Authenticate in the background so the first call finds a warm connection
+        if self._preconnect:
+            self._preconnect_task = asyncio.create_task(self._warmup())
+        return self
+
+    async def _warmup(self):
+        try:
+            await self._refresh_jwt_token()
+        except Exception as err:
+            self._preconnect_failed(err)
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    def _set_jwt_token(self, jwt_token: str, expiry: datetime):
+        super()._set_jwt_token(jwt_token, expiry)
+        self._auth_headers = {"Authorization": f"Bearer {jwt_token}"}
+
+    async def _refresh_jwt_token(self, force: bool = False):
+        if not force and self._jwt_token_current():
+            return
+
+        # When forced, the current token was rejected and must not be reused
+        stale = self._jwt_token if force else None
+        async with self._jwt_lock:
+            if self._use_cached_jwt_token(stale):
+                return
+
+            async with self._get_session().post(
+                self._urls["auth"],
+                data={"accessToken": self.token},
+                timeout=aiohttp.ClientTimeout(total=AUTH_TIMEOUT),
+            ) as resp:
+                jwt_token = (await self._process_response(resp))["authToken"]
+            self._store_jwt_token(jwt_token)
+
+    async def _request(self, method: str, url: str, headers=None, **kwargs):
+        await self._refresh_jwt_token()
+
+        attempt = 0
+        reauthenticated = False
+        while True:
+            if self._rate_limiter is not None:
+                await self._rate_limiter.acquire_async()
+            request_headers = (
+                {**self._auth_headers, **headers} if headers else self._auth_headers
+            )
+            async with self._get_session().request(
+                method, url, headers=request_headers, **kwargs
+            ) as resp:
+                # Server errors are only retried for idempotent methods, a 429
+                # means the request was not processed at all
+                if resp.status == 401 and not reauthenticated:
+                    # The server rejected the JWT before its advertised expiry
+                    reauthenticated = True
+                    delay = None
+                elif (
+                    attempt < MAX_RETRIES
+                    and resp.status in RETRY_STATUSES
+                    and (resp.status == 429 or method != "POST")
+                ):
+                    delay = retry_after(resp.headers, attempt, RETRY_BACKOFF_FACTOR)
+                    attempt += 1
+                else:
+                    return await self._process_response(resp)
+            if delay is None:
+                await self._refresh_jwt_token(force=True)
+            else:
+                await asyncio.sleep(delay)
+
+    async def get(self, endpoint: str, params=None, api_version: str = "v1"):
+        return await self._request(
+            "GET", self._url(endpoint, api_version=api_version), params=params
+        )
+
+    async def post(
+        self, endpoint: str, data=None, api_version: str = "v1", object_id: str = None
+    ):
+        return await self._request(
+            "POST",
+            self._url(endpoint, object_id, api_version),
+            data=json_dumps(data) if data is not None else None,
+            headers=JSON_HEADERS,
+        )
+
+    async def put(
+        self, endpoint: str, data=None, api_version: str = "v1", object_id: str = None
+    ):
+        return await self._request(
+            "PUT",
+            self._url(endpoint, object_id, api_version),
+            data=json_dumps(data) if data is not None else None,
+            headers=JSON_HEADERS,
+        )
+
+    @staticmethod
+    async def _process_response(resp: aiohttp.ClientResponse):
+        if resp.status >= 400:
+            logging.error(await resp.text())
+            resp.raise_for_status()
+
+        return json_loads(await resp.read())
+
+    async def orders(self, account_id: str | None = None) -> dict:
+        """Get all orders."""
+        params = {"accounts": account_id} if account_id else None
+        return await self._request("GET", self._urls["orders"], params=params)
+
+    async def performance(self, date_range: str = "max") -> dict:
+        return await self._request(
+            "GET", self._urls["performance"], params={"range": date_range}
+        )
+
+    async def holdings(self, date_range: str = "max") -> dict:
+        return await self._request(
+            "GET", self._urls["holdings"], params={"range": date_range}
+        )
+
+    async def position(self, data_source: str, symbol: str):
+        """Get position for a symbol from a data source."""
+        return await self.get(f"portfolio/position/{data_source}/{symbol}")
+
+    async def positions(self, symbols: list[tuple[str, str]]) -> list:
+        """Get positions for (data source, symbol) pairs concurrently."""
+        return await asyncio.gather(
+            *(self.position(data_source, symbol) for data_source, symbol in symbols)
+        )
+
+    async def import_transactions(self, data: dict, chunk_size: int | None = None):
+        """Import transactions, optionally posting `chunk_size` activities at a time.
+
+        Raises PartialImportError if a chunk fails after earlier ones were imported.
+        """
+        imported = 0
+        for chunk in import_chunks(data, chunk_size):
+            try:
+                await self._request(
+                    "POST",
+                    self._urls["import"],
+                    data=json_dumps(chunk),
+                    headers=JSON_HEADERS,
+                )
+            except Exception as err:
+                if imported:
+                    raise PartialImportError(imported) from err
+                raise
+            imported += len(chunk.get("activities") or [])
+
+    async def details(self) -> dict:
+        """Get all details, including accounts, positions, and summary."""
+        return await self._request("GET", self._urls["details"])
+
+    async def investments(
+        self, group_by: str = "month", date_range: str = "max"
+    ) -> dict:
+        """Get investments grouped by period."""
+        return await self._request(
+            "GET",
+            self._urls["investments"],
+            params={"range": date_range, "groupBy": group_by},
+        )
+
+    async def dividends(self, group_by: str = "month", date_range: str = "max") -> dict:
+        """Get dividends grouped by period."""
+        return await self._request(
+            "GET",
+            self._urls["dividends"],
+            params={"range": date_range, "groupBy": group_by},
+        )
+
+    async def accounts(self) -> dict:
+        return await self._request("GET", self._urls["accounts"])
+
+    async def market_data_admin(self) -> dict:
+        """Overview of market data loaded"""
+        return await self._request("GET", self._urls["market_data_admin"])
+
+    async def market_data(self, data_source: str, symbol: str):
+        """Get market data for a symbol from a data source."""
+        return await self.get(f"admin/market-data/{data_source}/{symbol}")
+
+    async def market_data_many(self, symbols: list[tuple[str, str]]) -> list:
+        """Get market data for (data source, symbol) pairs concurrently."""
+        return await asyncio.gather(
+            *(self.market_data(data_source, symbol) for data_source, symbol in symbols)
+        )
+
+    def __repr__(self):
+        return f"AsyncGhostfolio(host={self.host})"
@@ -0,0 +1,34 @@
+import base64
+import json
+
+import pytest
+import responses
+
+from ghostfolio import Ghostfolio
+
+HOST = "https://ghostfolio.test"
+AUTH_URL = f"{HOST}/api/v1/auth/anonymous/"
+
+
+def make_jwt(claims: dict) -> str:
+    payload = base64.urlsafe_b64encode(json.dumps(claims).encode()).rstrip(b"=")
+    return f"header.{payload.decode()}.signature"
+
+
+@pytest.fixture(autouse=True)
+def clear_auth_cache():
+    Ghostfolio.clear_auth_cache()
+    yield
+    Ghostfolio.clear_auth_cache()
+
+
+@pytest.fixture
+def mocked():
+    with responses.RequestsMock() as rsps:
+        yield rsps
+
+
+@pytest.fixture
+def client():
+    with Ghostfolio("token", host=HOST, preconnect=False) as client:
+        yield client
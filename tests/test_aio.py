@@ -0,0 +1,97 @@
+import asyncio
+from collections import Counter
+from datetime import datetime, timezone
+
+import aiohttp
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from ghostfolio import PartialImportError
+from ghostfolio.aio import AsyncGhostfolio
+from tests.conftest import make_jwt
+
+EXP = datetime(2030, 1, 1, tzinfo=timezone.utc).timestamp()
+
+
+class FakeServer:
+    """Counts requests and answers them with queued (status, body) responses."""
+
+    def __init__(self, imports=(), accounts=()):
+        self.hits = Counter()
+        self.tokens = [make_jwt({"exp": EXP, "n": n}) for n in range(3)]
+        self.responses = {"import": list(imports), "account": list(accounts)}
+
+    async def auth(self, request):
+        token = self.tokens[self.hits["auth"]]
+        self.hits["auth"] += 1
+        return web.json_response({"authToken": token}, status=201)
+
+    async def import_(self, request):
+        return self._reply("import")
+
+    async def accounts(self, request):
+        if request.headers["Authorization"] == f"Bearer {self.tokens[0]}":
+            self.hits["account"] += 1
+            return web.json_response({}, status=401)
+        return self._reply("account")
+
+    def _reply(self, name):
+        self.hits[name] += 1
+        status, body = self.responses[name].pop(0)
+        return web.json_response(body, status=status, headers={"Retry-After": "0"})
+
+    def app(self):
+        app = web.Application()
+        app.router.add_post("/api/v1/auth/anonymous/", self.auth)
+        app.router.add_post("/api/v1/import/", self.import_)
+        app.router.add_get("/api/v1/account/", self.accounts)
+        return app
+
+
+def run(server: FakeServer, scenario):
+    async def main():
+        async with TestServer(server.app()) as test_server:
+            host = str(test_server.make_url("/"))
+            async with AsyncGhostfolio("token", host=host, preconnect=False) as client:
+                return await scenario(client)
+
+    return asyncio.run(main())
+
+
+def test_unauthorized_forces_refresh_and_retries_once():
+    server = FakeServer(accounts=[(200, {"accounts": [1]})])
+
+    assert run(server, lambda client: client.accounts()) == {"accounts": [1]}
+    assert server.hits == {"auth": 2, "account": 2}
+
+
+def test_post_retries_rate_limited_requests():
+    server = FakeServer(imports=[(429, {}), (201, {})])
+
+    run(server, lambda client: client.import_transactions({"activities": []}))
+
+    assert server.hits["import"] == 2
+
+
+def test_post_does_not_retry_server_errors():
+    server = FakeServer(imports=[(500, {}), (201, {})])
+
+    with pytest.raises(aiohttp.ClientResponseError):
+        run(server, lambda client: client.import_transactions({"activities": []}))
+    assert server.hits["import"] == 1
+
+
+def test_chunked_import_reports_partial_progress():
+    server = FakeServer(imports=[(201, {}), (400, {})])
+
+    with pytest.raises(PartialImportError) as exc_info:
+        run(
+            server,
+            lambda client: client.import_transactions(
+                {"activities": list(range(5))}, chunk_size=2
+            ),
+        )
+
+    assert exc_info.value.imported == 2
+    assert isinstance(exc_info.value.__cause__, aiohttp.ClientResponseError)
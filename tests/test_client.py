@@ -0,0 +1,324 @@
+import gzip
+import json
+import time
+from datetime import datetime, timezone
+
+import pytest
+import requests
+import responses
+from responses import matchers
+
+import ghostfolio
+from ghostfolio import Ghostfolio, PartialImportError
+from ghostfolio._common import MAX_RETRIES, BaseClient
+from tests.conftest import AUTH_URL, HOST, make_jwt
+
+ACCOUNTS_URL = f"{HOST}/api/v1/account/"
+ORDERS_URL = f"{HOST}/api/v1/order/"
+MARKET_DATA_URL = f"{HOST}/api/v1/admin/market-data/"
+IMPORT_URL = f"{HOST}/api/v1/import/"
+EXP = datetime(2030, 1, 1, tzinfo=timezone.utc)
+
+
+def add_auth(mocked, jwt_token=None):
+    jwt_token = jwt_token or make_jwt({"exp": EXP.timestamp()})
+    mocked.add(responses.POST, AUTH_URL, json={"authToken": jwt_token}, status=201)
+    return jwt_token
+
+
+@pytest.fixture
+def no_sleep(monkeypatch):
+    slept = []
+    monkeypatch.setattr(ghostfolio.time, "sleep", slept.append)
+    return slept
+
+
+def test_authenticates_once_with_expiry_from_token(mocked, client):
+    jwt_token = add_auth(mocked)
+    mocked.add(
+        responses.GET,
+        ACCOUNTS_URL,
+        json={"accounts": []},
+        match=[matchers.header_matcher({"Authorization": f"Bearer {jwt_token}"})],
+    )
+
+    client.accounts(use_cache=False)
+    client.accounts(use_cache=False)
+
+    assert client._jwt_token_expiry == EXP
+    assert len(mocked.calls) == 3
+
+
+def test_clients_share_jwt(mocked):
+    add_auth(mocked)
+    mocked.add(responses.GET, ACCOUNTS_URL, json={"accounts": []})
+
+    for _ in range(2):
+        Ghostfolio("token", host=HOST, preconnect=False).accounts()
+
+    assert [call.request.url for call in mocked.calls].count(AUTH_URL) == 1
+
+
+def test_preconnect_authenticates_once_in_the_background(mocked, monkeypatch):
+    jwt_token = add_auth(mocked)
+    # Record the session header at the moment the token becomes visible to
+    # other threads, it must already be usable then
+    headers_when_published = []
+    set_jwt_token = BaseClient._set_jwt_token
+
+    def spy(self, *args):
+        headers_when_published.append(self._session.headers.get("Authorization"))
+        set_jwt_token(self, *args)
+
+    monkeypatch.setattr(BaseClient, "_set_jwt_token", spy)
+    mocked.add(
+        responses.GET,
+        ACCOUNTS_URL,
+        json={"accounts": []},
+        match=[matchers.header_matcher({"Authorization": f"Bearer {jwt_token}"})],
+    )
+
+    with Ghostfolio("token", host=HOST) as client:
+        assert client.accounts() == {"accounts": []}
+
+    assert [call.request.url for call in mocked.calls].count(AUTH_URL) == 1
+    assert set(headers_when_published) == {f"Bearer {jwt_token}"}
+
+
+def test_unauthorized_forces_refresh_and_retries_once(mocked, client):
+    stale = add_auth(mocked, make_jwt({"exp": EXP.timestamp(), "n": 1}))
+    fresh = add_auth(mocked, make_jwt({"exp": EXP.timestamp(), "n": 2}))
+    mocked.add(
+        responses.GET,
+        ACCOUNTS_URL,
+        status=401,
+        match=[matchers.header_matcher({"Authorization": f"Bearer {stale}"})],
+    )
+    mocked.add(
+        responses.GET,
+        ACCOUNTS_URL,
+        json={"accounts": [1]},
+        match=[matchers.header_matcher({"Authorization": f"Bearer {fresh}"})],
+    )
+
+    assert client.accounts() == {"accounts": [1]}
+    assert client._jwt_token == fresh
+
+
+def test_unauthorized_twice_raises(mocked, client):
+    add_auth(mocked)
+    add_auth(mocked)
+    mocked.add(responses.GET, ACCOUNTS_URL, status=401)
+
+    with pytest.raises(requests.HTTPError):
+        client.accounts()
+
+
+def test_cache_serves_repeated_gets_with_fresh_objects(mocked, client):
+    add_auth(mocked)
+    mocked.add(responses.GET, ACCOUNTS_URL, json={"accounts": [1, 2]})
+
+    first = client.accounts()
+    first["accounts"].append(99)
+    second = client.accounts()
+
+    assert second == {"accounts": [1, 2]}
+    assert second is not first
+    assert len(mocked.calls) == 2
+
+
+def test_cache_is_bypassed_and_cleared(mocked, client):
+    add_auth(mocked)
+    mocked.add(responses.GET, ACCOUNTS_URL, json={"accounts": []})
+    mocked.add(responses.POST, IMPORT_URL, json={}, status=201)
+
+    client.accounts()
+    client.accounts(use_cache=False)
+    client.import_transactions({"activities": []})
+    client.accounts()
+
+    assert [call.request.method for call in mocked.calls[1:]] == [
+        "GET",
+        "GET",
+        "POST",
+        "GET",
+    ]
+
+
+@pytest.mark.parametrize(
+    "params",
+    [{"accounts": ["a", "b"]}, [("accounts", "a"), ("accounts", "b")]],
+    ids=["dict-with-list", "list-of-pairs"],
+)
+def test_cache_accepts_params_of_any_shape(mocked, client, params):
+    add_auth(mocked)
+    mocked.add(
+        responses.GET,
+        ACCOUNTS_URL,
+        json={"accounts": [1]},
+        match=[matchers.query_string_matcher("accounts=a&accounts=b")],
+    )
+    mocked.add(
+        responses.GET,
+        ACCOUNTS_URL,
+        json={"accounts": [2]},
+        match=[matchers.query_string_matcher("accounts=a")],
+    )
+
+    assert client.get("account", params=params) == {"accounts": [1]}
+    assert client.get("account", params=params) == {"accounts": [1]}
+    assert client.get("account", params={"accounts": "a"}) == {"accounts": [2]}
+    assert len(mocked.calls) == 3
+
+
+def test_expired_entry_is_revalidated_with_etag(mocked, client, monkeypatch):
+    add_auth(mocked)
+    mocked.add(
+        responses.GET, ACCOUNTS_URL, json={"accounts": [1]}, headers={"ETag": '"v1"'}
+    )
+    revalidate = [matchers.header_matcher({"If-None-Match": '"v1"'})]
+    # The second 304 omits the ETag, the stored one must still be sent
+    mocked.add(responses.GET, ACCOUNTS_URL, status=304, match=revalidate)
+    mocked.add(responses.GET, ACCOUNTS_URL, status=304, match=revalidate)
+
+    assert client.accounts() == {"accounts": [1]}
+    now = time.monotonic()
+    for offset in (60, 120):
+        monkeypatch.setattr(ghostfolio.time, "monotonic", lambda: now + offset)
+        assert client.accounts() == {"accounts": [1]}
+
+    assert len(mocked.calls) == 4
+
+
+def test_changed_entry_without_etag_drops_the_old_one(mocked, client, monkeypatch):
+    add_auth(mocked)
+    mocked.add(
+        responses.GET, ACCOUNTS_URL, json={"accounts": [1]}, headers={"ETag": '"v1"'}
+    )
+    mocked.add(responses.GET, ACCOUNTS_URL, json={"accounts": [2]})
+
+    client.accounts()
+    now = time.monotonic()
+    for offset in (60, 120):
+        monkeypatch.setattr(ghostfolio.time, "monotonic", lambda: now + offset)
+        assert client.accounts() == {"accounts": [2]}
+
+    assert "If-None-Match" not in mocked.calls[-1].request.headers
+
+
+@pytest.fixture(params=["ijson", "fallback"])
+def streaming(request, monkeypatch):
+    if request.param == "fallback":
+        monkeypatch.setattr(ghostfolio, "ijson", None)
+    return request.param
+
+
+def test_iter_yields_list_items(mocked, client, streaming):
+    add_auth(mocked)
+    activities = [{"id": 1, "fee": 0.5}, {"id": 2, "fee": 1.25}]
+    mocked.add(responses.GET, ORDERS_URL, json={"activities": activities})
+    mocked.add(responses.GET, MARKET_DATA_URL, json={"marketData": [{"id": 3}]})
+
+    orders = list(client.orders_iter())
+    assert orders == activities
+    # ijson would produce Decimal without use_float
+    assert {type(order["fee"]) for order in orders} == {float}
+    assert list(client.market_data_admin_iter()) == [{"id": 3}]
+
+
+def test_iter_raises_http_errors_before_yielding(mocked, client, streaming):
+    add_auth(mocked)
+    mocked.add(responses.GET, ORDERS_URL, status=404)
+
+    with pytest.raises(requests.HTTPError):
+        next(iter(client.orders_iter()))
+
+
+def test_iter_decodes_gzip_bodies(mocked, client, streaming):
+    add_auth(mocked)
+    body = gzip.compress(json.dumps({"activities": [{"id": 1}]}).encode())
+    mocked.add(
+        responses.GET,
+        ORDERS_URL,
+        body=body,
+        headers={"Content-Encoding": "gzip"},
+        content_type="application/json",
+    )
+
+    assert list(client.orders_iter()) == [{"id": 1}]
+
+
+def test_post_retries_rate_limited_requests(mocked, client, no_sleep):
+    add_auth(mocked)
+    mocked.add(responses.POST, IMPORT_URL, status=429, headers={"Retry-After": "2"})
+    mocked.add(responses.POST, IMPORT_URL, json={}, status=201)
+
+    client.import_transactions({"activities": []})
+
+    assert no_sleep == [2]
+
+
+def test_post_does_not_retry_server_errors(mocked, client, no_sleep):
+    add_auth(mocked)
+    mocked.add(responses.POST, IMPORT_URL, status=500)
+
+    with pytest.raises(requests.HTTPError):
+        client.import_transactions({"activities": []})
+    assert no_sleep == []
+
+
+def test_post_gives_up_after_max_retries(mocked, client, no_sleep):
+    add_auth(mocked)
+    mocked.add(responses.POST, IMPORT_URL, status=429)
+
+    with pytest.raises(requests.HTTPError):
+        client.import_transactions({"activities": []})
+    assert len(no_sleep) == MAX_RETRIES
+
+
+def test_import_is_a_single_request_by_default(mocked, client):
+    add_auth(mocked)
+    mocked.add(responses.POST, IMPORT_URL, json={}, status=201)
+
+    client.import_transactions({"activities": list(range(1000))})
+
+    assert len(mocked.calls) == 2
+
+
+def test_chunked_import_reports_partial_progress(mocked, client):
+    add_auth(mocked)
+    mocked.add(responses.POST, IMPORT_URL, json={}, status=201)
+    mocked.add(responses.POST, IMPORT_URL, status=400)
+
+    with pytest.raises(PartialImportError) as exc_info:
+        client.import_transactions({"activities": list(range(5))}, chunk_size=2)
+
+    assert exc_info.value.imported == 2
+    assert isinstance(exc_info.value.__cause__, requests.HTTPError)
+
+
+def test_chunked_import_failing_first_chunk_raises_original_error(mocked, client):
+    add_auth(mocked)
+    mocked.add(responses.POST, IMPORT_URL, status=400)
+
+    with pytest.raises(requests.HTTPError):
+        client.import_transactions({"activities": list(range(5))}, chunk_size=2)
+
+
+def test_clients_for_the_same_token_and_host_are_equal():
+    first = Ghostfolio("token", host=f"{HOST}/", preconnect=False)
+    second = Ghostfolio("token", host=HOST, preconnect=False)
+    other = Ghostfolio("other", host=HOST, preconnect=False)
+
+    assert first == second
+    assert hash(first) == hash(second)
+    assert first != other
+    assert first != "token"
+    assert len({first, second, other}) == 2
+
+
+def test_token_and_host_are_read_only(client):
+    with pytest.raises(AttributeError):
+        client.token = "other"
+    with pytest.raises(AttributeError):
+        client.host = "https://other.test"
@@ -0,0 +1,53 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from ghostfolio._common import (
+    JWT_DEFAULT_TTL,
+    import_chunks,
+    jwt_expiry,
+    jwt_token_valid,
+)
+from tests.conftest import make_jwt
+
+
+def test_jwt_expiry_reads_exp_claim():
+    exp = datetime(2030, 1, 2, 3, 4, 5, tzinfo=timezone.utc)
+    assert jwt_expiry(make_jwt({"exp": exp.timestamp()})) == exp
+
+
+@pytest.mark.parametrize(
+    "jwt_token", ["not-a-jwt", "a.!!!.c", make_jwt({"sub": "user"})]
+)
+def test_jwt_expiry_falls_back_to_default_ttl(jwt_token):
+    expected = datetime.now(timezone.utc) + JWT_DEFAULT_TTL
+    assert abs(jwt_expiry(jwt_token) - expected) < timedelta(seconds=5)
+
+
+def test_jwt_token_valid_applies_margin():
+    now = datetime.now(timezone.utc)
+    assert jwt_token_valid(now + timedelta(hours=1))
+    assert not jwt_token_valid(now + timedelta(seconds=30))
+    assert not jwt_token_valid(now - timedelta(hours=1))
+    assert not jwt_token_valid(None)
+
+
+def test_import_chunks_keeps_small_payload_whole():
+    data = {"accounts": [{"id": "a"}], "activities": [1, 2]}
+    assert list(import_chunks(data, 2)) == [data]
+    assert list(import_chunks(data, None)) == [data]
+
+
+def test_import_chunks_splits_activities_and_repeats_meta():
+    data = {"meta": {"version": 1}, "activities": [1, 2, 3, 4, 5]}
+    assert list(import_chunks(data, 2)) == [
+        {"meta": {"version": 1}, "activities": [1, 2]},
+        {"meta": {"version": 1}, "activities": [3, 4]},
+        {"meta": {"version": 1}, "activities": [5]},
+    ]
+
+
+def test_import_chunks_refuses_to_split_accounts():
+    data = {"accounts": [{"id": "a"}], "activities": [1, 2, 3]}
+    with pytest.raises(ValueError, match="accounts"):
+        list(import_chunks(data, 2))
@@ -0,0 +1,97 @@
+import functools
+from datetime import datetime, timezone
+
+import httpx
+import pytest
+
+import ghostfolio
+from ghostfolio import Ghostfolio
+from tests.conftest import AUTH_URL, HOST, make_jwt
+
+JWT = make_jwt({"exp": datetime(2030, 1, 1, tzinfo=timezone.utc).timestamp()})
+ACCOUNTS_URL = f"{HOST}/api/v1/account/"
+IMPORT_URL = f"{HOST}/api/v1/import/"
+ORDERS_URL = f"{HOST}/api/v1/order/"
+
+
+class Handler:
+    """Records requests and answers them with queued responses per URL."""
+
+    def __init__(self):
+        self.requests: list[httpx.Request] = []
+        self.responses = {AUTH_URL: [httpx.Response(201, json={"authToken": JWT})]}
+
+    def add(self, url: str, *responses: httpx.Response):
+        self.responses.setdefault(url, []).extend(responses)
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        queue = self.responses[str(request.url.copy_with(query=None))]
+        return queue.pop(0) if len(queue) > 1 else queue[0]
+
+
+@pytest.fixture
+def handler(monkeypatch):
+    handler = Handler()
+    client = functools.partial(httpx.Client, transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(ghostfolio.httpx, "Client", client)
+    return handler
+
+
+@pytest.fixture
+def client(handler):
+    with Ghostfolio("token", host=HOST, http2=True, preconnect=False) as client:
+        yield client
+
+
+@pytest.fixture
+def no_sleep(monkeypatch):
+    slept = []
+    monkeypatch.setattr(ghostfolio.time, "sleep", slept.append)
+    return slept
+
+
+def test_get_sends_auth_and_accept_headers(handler, client):
+    handler.add(ACCOUNTS_URL, httpx.Response(200, json={"accounts": [1]}))
+
+    assert client.accounts() == {"accounts": [1]}
+    request = handler.requests[-1]
+    assert request.headers["Authorization"] == f"Bearer {JWT}"
+    assert request.headers["Accept"] == "application/json"
+
+
+def test_no_timeout_by_default(client):
+    assert client._session.timeout == httpx.Timeout(None)
+
+
+def test_get_retries_server_errors(handler, client, no_sleep):
+    handler.add(
+        ACCOUNTS_URL,
+        httpx.Response(503, headers={"Retry-After": "1"}),
+        httpx.Response(200, json={"accounts": []}),
+    )
+
+    assert client.accounts() == {"accounts": []}
+    assert no_sleep == [1]
+
+
+def test_post_retries_rate_limits_but_not_server_errors(handler, client, no_sleep):
+    handler.add(
+        IMPORT_URL,
+        httpx.Response(429, headers={"Retry-After": "2"}),
+        httpx.Response(201, json={}),
+        httpx.Response(500),
+    )
+
+    client.import_transactions({"activities": []})
+    with pytest.raises(httpx.HTTPStatusError):
+        client.import_transactions({"activities": []})
+
+    assert no_sleep == [2]
+    assert [str(r.url) for r in handler.requests].count(IMPORT_URL) == 3
+
+
+def test_iter_falls_back_to_a_full_download(handler, client):
+    handler.add(ORDERS_URL, httpx.Response(200, json={"activities": [{"id": 1}]}))
+
+    assert list(client.orders_iter()) == [{"id": 1}]
@@ -0,0 +1,47 @@
+from ghostfolio import ratelimit
+from ghostfolio.ratelimit import TokenBucket, retry_after
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+        self.slept = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+def test_token_bucket_allows_burst_then_waits(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(ratelimit.time, "monotonic", clock.monotonic)
+    monkeypatch.setattr(ratelimit.time, "sleep", clock.sleep)
+
+    bucket = TokenBucket(rate=2, burst=2)
+    bucket.acquire()
+    bucket.acquire()
+    assert clock.slept == []
+
+    bucket.acquire()
+    assert clock.slept == [0.5]
+
+
+def test_token_bucket_refills_over_time(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(ratelimit.time, "monotonic", clock.monotonic)
+    monkeypatch.setattr(ratelimit.time, "sleep", clock.sleep)
+
+    bucket = TokenBucket(rate=1, burst=1)
+    bucket.acquire()
+    clock.now += 1
+    bucket.acquire()
+    assert clock.slept == []
+
+
+def test_retry_after_uses_header_or_backoff():
+    assert retry_after({"Retry-After": "3"}, 0, 0.5) == 3
+    assert retry_after({"Retry-After": "Wed, 21 Oct 2015 07:28:00 GMT"}, 2, 0.5) == 2
+    assert retry_after({}, 1, 0.5) == 1